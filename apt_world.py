@@ -29,26 +29,21 @@ It supports three modes of operation:
    libraries, excluding common system infrastructure.
 """
 
+import os
+import json
+import re
 import sys
+import mmap
 import logging
 import argparse
-from typing import Dict, List, Optional, Set, Tuple, Any
-
-# Debian package import
-try:
-    from debian.deb822 import Deb822
-except ImportError:
-    print("Error: python3-debian library not found.", file=sys.stderr)
-    print("Please install it using: sudo apt install python3-debian", file=sys.stderr)
-    sys.exit(1)
+from operator import itemgetter
+from contextlib import contextmanager, nullcontext
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Set, Tuple, Union, Any
 
 # Rich library imports
 try:
     from rich.console import Console
     from rich.logging import RichHandler
-    from rich.table import Table
-    from rich.panel import Panel
-    from rich.text import Text # Import Text for potentially more control
 except ImportError:
     print("Error: python3-rich library not found.", file=sys.stderr)
     print("Please install it using: sudo apt install python3-rich", file=sys.stderr)
@@ -58,6 +53,10 @@ except ImportError:
 # --- Constants (Defaults) ---
 DEFAULT_DPKG_STATUS_PATH = "/var/lib/dpkg/status"
 DEFAULT_APT_EXTENDED_STATES_PATH = "/var/lib/apt/extended_states"
+DEFAULT_CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'apt-world')
+DEFAULT_INDEX_DIR = "/var/cache/apt-world" # System-wide cache written by --rebuild-index
+CACHE_FORMAT_VERSION = 3 # Bump whenever the layout of cached results changes
+READ_BUFFER_SIZE = 1 << 20 # 1 MiB: read streamed state files in a few large chunks
 
 
 # --- Logging Configuration (Using Rich) ---
@@ -78,91 +77,803 @@ logging.basicConfig(
 logger = logging.getLogger("apt_world")
 
 
-# --- Type Hint Alias ---
-PackageDetails = Dict[str, Any]
+# --- Package Details ---
+class PackageDetails(NamedTuple):
+    """
+    Details of an installed package, split into display columns at parse time.
+
+    auto_status is '0' for packages explicitly marked manual, else None.
+    """
+    name: str
+    arch: str
+    version: Optional[str]
+    priority: Optional[str]
+    section: Optional[str]
+    essential: Optional[str]
+    auto_status: Optional[str] = None
+
+
+# --- Stanza Scanning ---
+def _prefetch(path: str) -> None:
+    """
+    Asks the kernel to start reading a file into the page cache in the background.
+
+    Failures are ignored; the real read later reports any problem with the file.
+
+    Args:
+        path (str): Path of the file to prefetch.
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def _open_mapped(path: str) -> Iterator[Union[mmap.mmap, bytes]]:
+    """
+    Opens a file read-only and memory-maps its contents.
+
+    Empty files cannot be mapped, so an empty bytes object is yielded instead.
+
+    Args:
+        path (str): Path of the file to map.
+
+    Yields:
+        Union[mmap.mmap, bytes]: Read-only view of the whole file.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Stanzas are scanned front to back; ask for aggressive readahead
+            if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            yield mm
+
+
+# A newline followed by one or more empty or whitespace-only lines
+_STANZA_SEPARATOR = re.compile(rb"\n(?:[ \t]*\n)+")
+
+
+def _iter_stanzas(data: Union[mmap.mmap, bytes]) -> Iterator[bytes]:
+    """
+    Yields the raw bytes of each blank-line separated stanza in a deb822 buffer.
+
+    Every stanza is yielded with a leading newline, so any field, including
+    the first one, can be located with a single find(b"\\nField:") call.
+    Like python-debian, lines holding only spaces or tabs count as blank, and
+    runs of blank lines produce no stanza.
+    """
+    start = 0
+    for separator in _STANZA_SEPARATOR.finditer(data):
+        end = separator.start()
+        if end > start:
+            # Reuse the separator's last newline rather than prepending one
+            yield data[start - 1:end] if start else b"\n" + data[:end]
+        start = separator.end()
+    if start < len(data):
+        yield data[start - 1:] if start else b"\n" + data[:]
+
+
+def _iter_deb822_paragraphs(path: str) -> Iterator[Mapping[str, str]]:
+    """
+    Yields paragraphs parsed by python-debian's Deb822 reference parser (--strict).
+
+    Fields must be read with paragraph.get(): its lookup follows deb822 rules
+    (case-insensitive names, continuation lines), which the byte-level
+    find() of the built-in scanner does not.
+
+    Args:
+        path (str): Path of the deb822 file to parse.
+
+    Yields:
+        Mapping[str, str]: One Deb822 paragraph per stanza.
+    """
+    try:
+        from debian.deb822 import Deb822
+    except ImportError:
+        print("Error: python3-debian library not found (required by --strict).", file=sys.stderr)
+        print("Please install it using: sudo apt install python3-debian", file=sys.stderr)
+        sys.exit(1)
+    with open(path, 'r', encoding='utf-8', buffering=READ_BUFFER_SIZE) as f:
+        yield from Deb822.iter_paragraphs(f)
+
+
+def _get_raw_field(stanza: bytes, field: bytes) -> Optional[bytes]:
+    """
+    Extracts the raw value of a single-line field from a stanza.
+
+    Only the first line of the field is returned; continuation lines are never
+    inspected, which is fine for the fields apt-world reads.
+
+    Args:
+        stanza (bytes): Raw stanza as yielded by _iter_stanzas.
+        field (bytes): Newline-anchored field name, e.g. b"\\nPackage:".
+
+    Returns:
+        Optional[bytes]: The stripped field value, or None if the field is absent.
+    """
+    start = stanza.find(field)
+    if start == -1:
+        return None
+    start += len(field)
+    end = stanza.find(b"\n", start)
+    if end == -1:
+        end = len(stanza)
+    return stanza[start:end].strip()
+
+
+def _get_field(stanza: bytes, field: bytes) -> Optional[str]:
+    """Like _get_raw_field, but decodes the value to str."""
+    value = _get_raw_field(stanza, field)
+    return None if value is None else value.decode('utf-8')
+
+
+def _encode(value: Optional[str]) -> Optional[bytes]:
+    """Encodes a Deb822 field value into the raw form the scanners produce."""
+    return None if value is None else value.encode('utf-8')
+
+
+def _decode_architecture(raw_arch: Optional[bytes], arch_names: Dict[bytes, str]) -> Optional[str]:
+    """
+    Decodes a raw Architecture value, decoding each distinct value only once.
+
+    A system only has a handful of architectures (amd64, all, i386, ...), so
+    the decoded and interned strings are memoized in arch_names by raw value.
+
+    Args:
+        raw_arch (Optional[bytes]): Raw field value, or None if absent.
+        arch_names (Dict[bytes, str]): Memo shared across one parse.
+
+    Returns:
+        Optional[str]: The architecture, or None if the field is absent.
+    """
+    if raw_arch is None:
+        return None
+    architecture = arch_names.get(raw_arch)
+    if architecture is None:
+        architecture = arch_names[raw_arch] = sys.intern(raw_arch.decode('utf-8'))
+    return architecture
+
+
+def _iter_extended_states_records(data: bytes) -> Iterator[Tuple[Optional[bytes], Optional[bytes], Optional[bytes]]]:
+    """
+    Yields the raw (Package, Architecture, Auto-Installed) values of each stanza.
+
+    Handles any field order or missing fields; files in apt's canonical
+    layout take the faster _scan_extended_states() path instead.
+
+    Args:
+        data (bytes): Whole contents of the extended_states file.
+
+    Yields:
+        Tuple[Optional[bytes], Optional[bytes], Optional[bytes]]: Stripped
+        field values, None for fields missing from the stanza.
+    """
+    package = architecture = auto_installed = None
+    for line in data.splitlines(keepends=True):
+        if line.isspace():
+            if package is not None or architecture is not None or auto_installed is not None:
+                yield package, architecture, auto_installed
+                package = architecture = auto_installed = None
+        elif line.startswith(b"Package:"):
+            package = line[8:].strip()
+        elif line.startswith(b"Architecture:"):
+            architecture = line[13:].strip()
+        elif line.startswith(b"Auto-Installed:"):
+            auto_installed = line[15:].strip()
+    if package is not None or architecture is not None or auto_installed is not None:
+        yield package, architecture, auto_installed
+
+
+# apt writes every extended_states stanza as exactly these three lines
+_EXTENDED_STATES_RECORD = re.compile(
+    rb"^Package:[ \t]*(\S+)[ \t]*\nArchitecture:[ \t]*(\S+)[ \t]*\nAuto-Installed:[ \t]*(\S+)[ \t]*$", re.M
+)
+
+
+def _scan_extended_states(data: bytes) -> Optional[List[Tuple[bytes, bytes, bytes]]]:
+    """
+    Extracts (Package, Architecture, Auto-Installed) from an extended_states
+    buffer written in apt's canonical layout, in a single regex sweep.
+
+    Args:
+        data (bytes): Whole contents of the extended_states file.
+
+    Returns:
+        Optional[List[Tuple[bytes, bytes, bytes]]]: The raw field values, or
+        None if any field lies outside a canonical stanza (reordered, missing
+        or extra fields), in which case the line parser must be used.
+    """
+    records = _EXTENDED_STATES_RECORD.findall(data)
+    # Every field occurrence must belong to a match, or some stanza was missed
+    count = len(records)
+    if data.count(b"Package:") != count or data.count(b"Architecture:") != count or data.count(b"Auto-Installed:") != count:
+        return None
+    return records
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Interns a field value; for fields with few distinct values."""
+    return None if value is None else sys.intern(value)
+
+
+def _get_interned_field(stanza: bytes, field: bytes) -> Optional[str]:
+    """Like _get_field, but interns the value."""
+    return _intern(_get_field(stanza, field))
+
+
+def _qualify(package_name: str, architecture: str) -> str:
+    """
+    Returns the interned 'package:arch' name, leaving qualified names untouched.
+
+    Interning makes the names produced by both parsers the same objects, so
+    set lookups between them succeed on the identity check.
+    """
+    return sys.intern(package_name if ':' in package_name else f"{package_name}:{architecture}")
+
+
+# Raw bytes from the built-in scanner, or a Deb822 paragraph in --strict mode
+_Stanza = Union[bytes, Mapping[str, str]]
+
+# dpkg writes this exact line for practically every installed package
+_STATUS_INSTALLED = b"\nStatus: install ok installed"
+
+
+def _is_installed(stanza: bytes) -> bool:
+    """
+    Checks whether a dpkg status stanza describes an installed package.
+
+    The canonical 'install ok installed' line is matched with a single find();
+    only stanzas that miss it have their Status field split into tokens.
+    """
+    pos = stanza.find(_STATUS_INSTALLED)
+    if pos != -1:
+        end = pos + len(_STATUS_INSTALLED)
+        if end == len(stanza) or stanza[end:end + 1] == b"\n":
+            return True
+    return _is_installed_status(_get_field(stanza, b"\nStatus:"), _get_field(stanza, b"\nPackage:"))
+
+
+def _is_installed_status(status: Optional[str], package_name: Optional[str]) -> bool:
+    """
+    Checks whether a Status field value means 'install ok installed'.
+
+    Args:
+        status (Optional[str]): The Status value, or None if the field is absent.
+        package_name (Optional[str]): Package name, for the warning only.
+
+    Returns:
+        bool: True if the package is installed.
+    """
+    if status is None:
+        logger.warning("Skipping package '%s': missing 'Status' field.", package_name)
+        return False
+    status_parts = status.split()
+    return len(status_parts) >= 3 and status_parts[0] == 'install' and status_parts[1] == 'ok' and status_parts[2] == 'installed'
 
 
 # --- Helper Functions ---
-def parse_extended_states(extended_states_path: str) -> Tuple[Set[str], Set[str]]:
+def parse_extended_states(extended_states_path: str, strict: bool = False) -> Tuple[FrozenSet[str], FrozenSet[str]]:
     """
     Parses the extended_states file.
 
     Args:
         extended_states_path (str): Path to the apt extended_states file.
+        strict (bool): Parse with the Deb822 reference parser instead of the
+            built-in scanner.
 
     Returns:
-        Tuple[Set[str], Set[str]]: A tuple containing:
-            - set of packages marked Auto-Installed: 1 (automatic)
-            - set of packages marked Auto-Installed: 0 (explicitly manual)
+        Tuple[FrozenSet[str], FrozenSet[str]]: A tuple containing:
+            - read-only set of packages marked Auto-Installed: 1 (automatic)
+            - read-only set of packages marked Auto-Installed: 0 (explicitly manual)
     """
     automatic_packages: Set[str] = set()
     explicitly_manual_packages: Set[str] = set()
+    arch_names: Dict[bytes, str] = {}
+    debug_enabled = logger.isEnabledFor(logging.DEBUG) # Checked once, not per record
     try:
-        logger.debug(f"Parsing extended states file: {extended_states_path}")
-        with open(extended_states_path, 'r', encoding='utf-8') as f:
-            for paragraph in Deb822.iter_paragraphs(f):
-                auto_installed = paragraph.get('Auto-Installed')
-                package_name = paragraph.get('Package')
-                architecture = paragraph.get('Architecture')
-                if package_name and architecture:
-                    pkg_full_name = f"{package_name}:{architecture}"
-                    if auto_installed == '1':
-                        logger.debug(f"  Found automatic: {pkg_full_name}")
-                        automatic_packages.add(pkg_full_name)
-                    elif auto_installed == '0':
-                        logger.debug(f"  Found explicit manual: {pkg_full_name}")
-                        explicitly_manual_packages.add(pkg_full_name)
-            logger.debug(f" Finished parsing extended_states: {len(automatic_packages)} auto, {len(explicitly_manual_packages)} explicit manual.")
+        logger.debug("Parsing extended states file: %s", extended_states_path)
+        if strict:
+            records: Iterable[Tuple[Optional[bytes], Optional[bytes], Optional[bytes]]] = (
+                (_encode(paragraph.get('Package')), _encode(paragraph.get('Architecture')), _encode(paragraph.get('Auto-Installed')))
+                for paragraph in _iter_deb822_paragraphs(extended_states_path)
+            )
+        else:
+            # The file is small, so it is read whole as bytes; no text decoding
+            # happens beyond the package names that end up in the result sets.
+            with open(extended_states_path, 'rb') as f:
+                data = f.read()
+            scanned = _scan_extended_states(data)
+            if scanned is None:
+                logger.debug("Non-canonical layout in %s; parsing it line by line.", extended_states_path)
+            records = scanned if scanned is not None else _iter_extended_states_records(data)
+        for raw_package, raw_arch, auto_installed in records:
+            # The flag is a single ASCII digit, so compare the raw bytes rather
+            # than going through int() and its ValueError handling.
+            if auto_installed is None:
+                continue
+            if not raw_package:
+                logger.warning("Skipping stanza without 'Package' field in %s.", extended_states_path)
+                continue
+            architecture = _decode_architecture(raw_arch, arch_names)
+            if not architecture:
+                continue
+            pkg_full_name = _qualify(raw_package.decode('utf-8'), architecture)
+            if auto_installed == b'1':
+                if debug_enabled: logger.debug("  Found automatic: %s", pkg_full_name)
+                automatic_packages.add(pkg_full_name)
+            elif auto_installed == b'0':
+                if debug_enabled: logger.debug("  Found explicit manual: %s", pkg_full_name)
+                explicitly_manual_packages.add(pkg_full_name)
+            else:
+                logger.warning("Skipping '%s' in %s: Auto-Installed value '%s' is not 0 or 1.", pkg_full_name, extended_states_path, auto_installed.decode('utf-8', 'replace'))
+        logger.debug(" Finished parsing extended_states: %d auto, %d explicit manual.", len(automatic_packages), len(explicitly_manual_packages))
     except FileNotFoundError:
-        logging.warning(f"Apt extended_states file not found: {extended_states_path}. Cannot determine automatic/explicit status accurately.")
+        logging.warning("Apt extended_states file not found: %s. Cannot determine automatic/explicit status accurately.", extended_states_path)
     except Exception as e:
-        logging.error(f"Error parsing Apt extended_states file {extended_states_path}: {e}")
-    logger.debug(f" Returning {len(automatic_packages)} auto packages, {len(explicitly_manual_packages)} explicit manual packages.")
-    return automatic_packages, explicitly_manual_packages
+        logging.error("Error parsing Apt extended_states file %s: %s", extended_states_path, e)
+    logger.debug(" Returning %d auto packages, %d explicit manual packages.", len(automatic_packages), len(explicitly_manual_packages))
+    return frozenset(automatic_packages), frozenset(explicitly_manual_packages)
 
 
-def parse_dpkg_status(status_file_path: str) -> Tuple[Set[str], Dict[str, PackageDetails]]:
+def _extract_details(package_name: str, architecture: str, stanza: _Stanza, auto_status: Optional[str] = None) -> PackageDetails:
     """
-    Parses the dpkg status file to find installed packages and their details.
+    Builds the PackageDetails of an installed package from its stanza.
 
-    Returns:
-        Tuple[Set[str], Dict[str, PackageDetails]]: A tuple containing:
-         - set of installed packages ('package:arch')
-         - dict mapping 'package:arch' to its details (priority, essential, version, section)
+    The stanza is raw bytes from the built-in scanner, or a Deb822 paragraph
+    in --strict mode, whose fields are then read through its own lookup.
+    """
+    if not isinstance(stanza, bytes):
+        return PackageDetails(
+            package_name,
+            architecture,
+            stanza.get('Version'),
+            _intern(stanza.get('Priority')),
+            _intern(stanza.get('Section')),
+            _intern(stanza.get('Essential')),
+            auto_status
+        )
+    return PackageDetails(
+        package_name,
+        architecture,
+        _get_field(stanza, b"\nVersion:"),
+        _get_interned_field(stanza, b"\nPriority:"),
+        _get_interned_field(stanza, b"\nSection:"),
+        _get_interned_field(stanza, b"\nEssential:"),
+        auto_status
+    )
+
+
+def _iter_status_records(data: Union[mmap.mmap, bytes], arch_names: Dict[bytes, str]) -> Iterator[Tuple[Optional[str], Optional[str], bytes]]:
+    """
+    Yields the package name, architecture and stanza of each installed stanza
+    found by the built-in scanner.
+    """
+    for stanza in _iter_stanzas(data):
+        if _is_installed(stanza):
+            yield _get_field(stanza, b"\nPackage:"), _decode_architecture(_get_raw_field(stanza, b"\nArchitecture:"), arch_names), stanza
+
+
+def _iter_deb822_status_records(status_file_path: str) -> Iterator[Tuple[Optional[str], Optional[str], Mapping[str, str]]]:
+    """
+    Yields the package name, architecture and paragraph of each installed
+    paragraph found by the Deb822 reference parser (--strict).
+    """
+    for paragraph in _iter_deb822_paragraphs(status_file_path):
+        package_name = paragraph.get('Package')
+        if _is_installed_status(paragraph.get('Status'), package_name):
+            yield package_name, _intern(paragraph.get('Architecture')), paragraph
+
+
+def _iter_installed_stanzas(status_file_path: str, strict: bool = False) -> Iterator[Tuple[str, str, str, _Stanza]]:
+    """
+    Streams installed packages out of the dpkg status file with their raw stanza.
+
+    Details are left unparsed so callers only pay for the packages they keep;
+    see _extract_details().
+
+    Args:
+        status_file_path (str): Path to the dpkg status file.
+        strict (bool): Parse with the Deb822 reference parser instead of the
+            built-in scanner.
+
+    Yields:
+        Tuple[str, str, str, _Stanza]: 'package:arch', the package name,
+        the architecture and the stanza (a Deb822 paragraph in --strict mode).
     """
-    installed_packages: Set[str] = set()
-    package_details: Dict[str, PackageDetails] = {}
+    count = 0
+    arch_names: Dict[bytes, str] = {}
+    debug_enabled = logger.isEnabledFor(logging.DEBUG) # Checked once, not per stanza
     try:
-        logger.debug(f"Parsing dpkg status file: {status_file_path}")
-        with open(status_file_path, 'r', encoding='utf-8') as f:
-            for paragraph in Deb822.iter_paragraphs(f):
-                status_parts = paragraph.get('Status', '').split()
-                is_installed = len(status_parts) >= 3 and status_parts[0] == 'install' and status_parts[1] == 'ok' and status_parts[2] == 'installed'
-
-                if is_installed:
-                    package_name = paragraph.get('Package')
-                    architecture = paragraph.get('Architecture')
-                    if package_name and architecture:
-                        pkg_full_name = f"{package_name}:{architecture}"
-                        logger.debug(f"  Found installed: {pkg_full_name}")
-                        installed_packages.add(pkg_full_name)
-                        # Store details needed for heuristics AND display
-                        details: PackageDetails = {
-                            'priority': paragraph.get('Priority'),
-                            'essential': paragraph.get('Essential'),
-                            'version': paragraph.get('Version'),
-                            'section': paragraph.get('Section')
-                        }
-                        package_details[pkg_full_name] = details
-            logger.debug(f" Finished parsing dpkg_status: Found {len(installed_packages)} installed packages.")
+        logger.debug("Parsing dpkg status file: %s", status_file_path)
+        # Only the built-in scanner maps the file; python-debian reads it itself
+        with (nullcontext() if strict else _open_mapped(status_file_path)) as data:
+            records = _iter_deb822_status_records(status_file_path) if strict else _iter_status_records(data, arch_names)
+            for package_name, architecture, stanza in records:
+                if not package_name:
+                    logger.warning("Skipping installed stanza without 'Package' field in %s.", status_file_path)
+                elif architecture:
+                    pkg_full_name = _qualify(package_name, architecture)
+                    if debug_enabled: logger.debug("  Found installed: %s", pkg_full_name)
+                    count += 1
+                    yield pkg_full_name, package_name, architecture, stanza
+            logger.debug(" Finished parsing dpkg_status: Found %d installed packages.", count)
     except FileNotFoundError:
-        logging.error(f"DPKG status file not found: {status_file_path}")
+        logging.error("DPKG status file not found: %s", status_file_path)
         sys.exit(1)
     except Exception as e:
-        logging.error(f"Error parsing DPKG status file {status_file_path}: {e}")
+        logging.error("Error parsing DPKG status file %s: %s", status_file_path, e)
         sys.exit(1)
-    logger.debug(f" Returning {len(installed_packages)} installed packages and details for {len(package_details)}.")
-    return installed_packages, package_details
+
+
+def iter_installed_packages(status_file_path: str, strict: bool = False) -> Iterator[Tuple[str, PackageDetails]]:
+    """
+    Streams installed packages and their details out of the dpkg status file.
+
+    Packages are yielded as soon as their stanza is scanned, so callers can
+    classify them without first collecting the whole file into a set.
+
+    Args:
+        status_file_path (str): Path to the dpkg status file.
+        strict (bool): Parse with the Deb822 reference parser instead of the
+            built-in scanner.
+
+    Yields:
+        Tuple[str, PackageDetails]: 'package:arch' and its details.
+    """
+    for pkg_full_name, package_name, architecture, stanza in _iter_installed_stanzas(status_file_path, strict):
+        yield pkg_full_name, _extract_details(package_name, architecture, stanza)
+
+
+def parse_dpkg_status(status_file_path: str, strict: bool = False) -> Dict[str, PackageDetails]:
+    """
+    Parses the dpkg status file to find installed packages and their details.
+
+    Args:
+        status_file_path (str): Path to the dpkg status file.
+        strict (bool): Parse with the Deb822 reference parser instead of the
+            built-in scanner.
+
+    Returns:
+        Dict[str, PackageDetails]: Maps each installed 'package:arch' to its
+        details, in status file order.
+        Its keys are the installed set; dpkg never lists a package:arch twice.
+    """
+    package_details: Dict[str, PackageDetails] = dict(iter_installed_packages(status_file_path, strict))
+    logger.debug(" Returning details for %d installed packages.", len(package_details))
+    return package_details
+
+
+def _is_base_package(details: PackageDetails) -> bool:
+    """Checks whether a package is likely part of the base system (Essential, or required/important priority)."""
+    return details.essential == 'yes' or details.priority in ('required', 'important')
+
+
+def _apply_filter_base(installed: Iterable[Tuple[str, str, str, _Stanza]], auto_installed_set: FrozenSet[str], explicitly_manual_set: FrozenSet[str]) -> Iterator[Tuple[str, PackageDetails]]:
+    """
+    Filters installed packages down to the 'not automatic' ones that are not
+    part of the base system, unless explicitly marked manual.
+
+    Kept free of module state and fully typed so the per-package hot loop
+    can be reasoned about (or compiled) on its own.
+
+    Args:
+        installed (Iterable[Tuple[str, str, str, _Stanza]]): Installed packages,
+            as yielded by _iter_installed_stanzas().
+        auto_installed_set (FrozenSet[str]): Packages marked Auto-Installed: 1.
+        explicitly_manual_set (FrozenSet[str]): Packages marked Auto-Installed: 0.
+
+    Yields:
+        Tuple[str, PackageDetails]: 'package:arch' and its details.
+    """
+    debug_enabled = logger.isEnabledFor(logging.DEBUG) # Checked once, not per package
+    for pkg, package_name, architecture, stanza in installed:
+        if pkg in auto_installed_set:
+            continue
+        if pkg in explicitly_manual_set:
+            if debug_enabled: logger.debug("  Keeping '%s' (explicitly marked manual)", pkg)
+            yield pkg, _extract_details(package_name, architecture, stanza, '0')
+            continue
+        current_details = _extract_details(package_name, architecture, stanza)
+        if _is_base_package(current_details):
+            if debug_enabled: logger.debug("  Filtering out '%s' (Essential: %s, Priority: %s)", pkg, current_details.essential, current_details.priority)
+            continue
+        if debug_enabled: logger.debug("  Keeping '%s' (passed base filters)", pkg)
+        yield pkg, current_details
+
+
+def _classify(operating_mode: str, installed: Iterable[Tuple[str, str, str, _Stanza]], auto_installed_set: FrozenSet[str], explicitly_manual_set: FrozenSet[str]) -> Iterator[Tuple[str, PackageDetails]]:
+    """
+    Selects the installed packages to report for the given operating mode.
+
+    Args:
+        operating_mode (str): One of 'default', 'explicit' or 'filter_base'.
+        installed (Iterable[Tuple[str, str, str, _Stanza]]): Installed packages,
+            as yielded by _iter_installed_stanzas().
+        auto_installed_set (FrozenSet[str]): Packages marked Auto-Installed: 1.
+        explicitly_manual_set (FrozenSet[str]): Packages marked Auto-Installed: 0.
+
+    Yields:
+        Tuple[str, PackageDetails]: 'package:arch' and its details.
+    """
+    # Calculation Logic
+    count = 0
+    if operating_mode == "explicit":
+        logger.debug("Calculating Mode 2: Explicitly Manual (Auto-Installed: 0)")
+        for pkg, package_name, architecture, stanza in installed:
+            if pkg not in explicitly_manual_set:
+                continue
+            count += 1
+            yield pkg, _extract_details(package_name, architecture, stanza, '0')
+        logger.debug("Resulting packages (installed and Auto-Installed: 0): %d", count)
+    elif operating_mode == "filter_base":
+        logger.debug("Calculating Mode 3: Filter Base Packages")
+        for pkg, details in _apply_filter_base(installed, auto_installed_set, explicitly_manual_set):
+            count += 1
+            yield pkg, details
+        logger.debug("Resulting packages after filtering base: %d", count)
+    else: # Default mode
+        logger.debug("Calculating Mode 1: Default (Not Automatic)")
+        for pkg, package_name, architecture, stanza in installed:
+            if pkg in auto_installed_set:
+                continue
+            count += 1
+            yield pkg, _extract_details(package_name, architecture, stanza, '0' if pkg in explicitly_manual_set else None)
+        logger.debug("Resulting packages (installed and not Auto-Installed: 1): %d", count)
+
+
+def iter_selected_packages(operating_mode: str, status_file_path: str, extended_states_path: str, strict: bool = False) -> Iterator[Tuple[str, PackageDetails]]:
+    """
+    Streams the installed packages to report for the given operating mode.
+
+    Packages are yielded in status file order as soon as they are classified.
+
+    Args:
+        operating_mode (str): One of 'default', 'explicit' or 'filter_base'.
+        status_file_path (str): Path to the dpkg status file.
+        extended_states_path (str): Path to the apt extended_states file.
+        strict (bool): Parse with the Deb822 reference parser instead of the
+            built-in scanner.
+
+    Yields:
+        Tuple[str, PackageDetails]: 'package:arch' and its details, with
+        'auto_status' set to '0' for explicitly manual packages, else None.
+    """
+    # Extended states are read first so the (much larger) status file can
+    # be classified in a single streaming pass, without intermediate sets.
+    # Kick off readahead of the status file first so that, on a cold page
+    # cache, its disk I/O overlaps with parsing extended_states.
+    _prefetch(status_file_path)
+    auto_installed_set, explicitly_manual_set = parse_extended_states(extended_states_path, strict)
+
+    yield from _classify(operating_mode, _iter_installed_stanzas(status_file_path, strict), auto_installed_set, explicitly_manual_set)
+
+
+def select_packages(operating_mode: str, status_file_path: str, extended_states_path: str, strict: bool = False) -> Dict[str, PackageDetails]:
+    """
+    Collects iter_selected_packages into a dict (in status file order).
+
+    Returns:
+        Dict[str, PackageDetails]: 'package:arch' mapped to its details.
+    """
+    return dict(iter_selected_packages(operating_mode, status_file_path, extended_states_path, strict))
+
+
+# --- Result Cache ---
+def _cache_key(*paths: str) -> Optional[List[Any]]:
+    """
+    Builds a cache key identifying the current contents of the given files.
+
+    The key is made of plain lists, so it compares equal after a JSON round trip.
+
+    Returns:
+        Optional[List[Any]]: The key, or None if any file cannot be
+        stat'ed (in which case nothing should be cached).
+    """
+    key: List[Any] = [CACHE_FORMAT_VERSION]
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key.append([os.path.abspath(path), st.st_ino, st.st_mtime_ns, st.st_size])
+    return key
+
+
+class _WarningCounter(logging.Handler):
+    """Counts WARNING-and-above records, i.e. signs of a degraded parse."""
+
+    def __init__(self) -> None:
+        super().__init__(logging.WARNING)
+        self.count = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.count += 1
+
+
+@contextmanager
+def _count_warnings() -> Iterator[_WarningCounter]:
+    """
+    Counts the warnings and errors logged while the block runs.
+
+    The parsers log and carry on past unreadable files and malformed
+    stanzas, so a non-zero count means the results must not be cached:
+    a cached run would repeat them without the messages.
+
+    Yields:
+        _WarningCounter: Counter whose 'count' holds the records seen so far.
+    """
+    counter = _WarningCounter()
+    root_logger = logging.getLogger()
+    root_logger.addHandler(counter)
+    try:
+        yield counter
+    finally:
+        root_logger.removeHandler(counter)
+
+
+def _load_cache(name: str, key: List[Any], cache_dir: Optional[str] = None) -> Optional[Dict[str, PackageDetails]]:
+    """
+    Loads cached package details if they were stored under the same key.
+
+    Entries are plain JSON rather than pickles, so a cache directory that
+    someone else can write to (e.g. under 'sudo -E') can at worst hold wrong
+    data, never code.
+
+    Args:
+        name (str): Cache entry name (file name inside the cache directory).
+        key (List[Any]): Key the entry must have been stored with.
+        cache_dir (Optional[str]): Directory to look in (default: the user cache).
+
+    Returns:
+        Optional[Dict[str, PackageDetails]]: The cached selection, or None on
+        a miss or unreadable cache.
+    """
+    cache_path = os.path.join(cache_dir or DEFAULT_CACHE_DIR, name)
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+        if entry['key'] != key:
+            logger.debug("Cache %s is stale.", cache_path)
+            return None
+        # Each package is stored as ['package:arch', *PackageDetails fields]
+        value = {row[0]: PackageDetails(*row[1:]) for row in entry['packages']}
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.debug("Ignoring unreadable cache %s: %s", cache_path, e)
+        return None
+    logger.debug("Using cached results from %s", cache_path)
+    return value
+
+
+def _store_cache(name: str, key: List[Any], value: Dict[str, PackageDetails], cache_dir: Optional[str] = None) -> bool:
+    """
+    Atomically stores package details in the cache; failures are logged and ignored.
+
+    Args:
+        name (str): Cache entry name (file name inside the cache directory).
+        key (List[Any]): Key to store the entry under.
+        value (Dict[str, PackageDetails]): Selection to cache.
+        cache_dir (Optional[str]): Directory to write to (default: the user cache).
+
+    Returns:
+        bool: True if the entry was written.
+    """
+    cache_dir = cache_dir or DEFAULT_CACHE_DIR
+    cache_path = os.path.join(cache_dir, name)
+    tmp_path = None
+    try:
+        import tempfile # Only needed on cache writes; keeps it off the startup path
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=f".{name}.")
+        # mkstemp creates 0600 files; the system index must be world-readable
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'packages': [[pkg, *details] for pkg, details in value.items()]}, f, separators=(',', ':'))
+        os.replace(tmp_path, cache_path)
+        logger.debug("Stored results in cache %s", cache_path)
+        return True
+    except Exception as e:
+        logger.debug("Could not write cache %s: %s", cache_path, e)
+        if tmp_path:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+        return False
+
+
+def rebuild_index(status_file_path: str, extended_states_path: str, index_dir: str = DEFAULT_INDEX_DIR) -> bool:
+    """
+    Precomputes the results of every operating mode into the system-wide index.
+
+    Meant to run from a dpkg post-invoke hook (as root), so that later runs
+    by any user find their results without parsing the state files. Entries
+    carry the usual cache key and are ignored once either file changes.
+
+    Args:
+        status_file_path (str): Path to the dpkg status file.
+        extended_states_path (str): Path to the apt extended_states file.
+        index_dir (str): Directory to write the index to.
+
+    Returns:
+        bool: True if an entry was written for every mode; False (with
+        nothing written) if parsing logged any warning or error.
+    """
+    cache_key = _cache_key(status_file_path, extended_states_path)
+    if cache_key is None:
+        logger.error("Cannot index: %s or %s is missing.", status_file_path, extended_states_path)
+        return False
+    with _count_warnings() as warnings_logged:
+        # Parse both files once and fill every mode in the same streaming
+        # pass, extracting each package's details once and holding no stanzas
+        _prefetch(status_file_path)
+        auto_installed_set, explicitly_manual_set = parse_extended_states(extended_states_path)
+        default: Dict[str, PackageDetails] = {}
+        explicit: Dict[str, PackageDetails] = {}
+        filter_base: Dict[str, PackageDetails] = {}
+        for pkg, package_name, architecture, stanza in _iter_installed_stanzas(status_file_path):
+            is_auto = pkg in auto_installed_set
+            is_explicit = pkg in explicitly_manual_set
+            if is_auto and not is_explicit:
+                continue
+            details = _extract_details(package_name, architecture, stanza, '0' if is_explicit else None)
+            if is_explicit:
+                explicit[pkg] = details
+            if not is_auto:
+                default[pkg] = details
+                if is_explicit or not _is_base_package(details):
+                    filter_base[pkg] = details
+        selections = {"default": default, "explicit": explicit, "filter_base": filter_base}
+    if warnings_logged.count:
+        # A degraded parse would otherwise be served to every user
+        logger.error("Not indexing: parsing %s and %s reported problems.", status_file_path, extended_states_path)
+        return False
+    ok = True
+    for operating_mode, selected in selections.items():
+        if not _store_cache(f"{operating_mode}.json", cache_key, selected, index_dir):
+            logger.error("Could not write the %s index to %s.", operating_mode, index_dir)
+            ok = False
+    return ok
+
+
+# --- Output Formatting ---
+def _markup_row(cells: Tuple[str, ...], styles: Tuple[str, ...], widths: Tuple[int, ...], separator: str) -> str:
+    """
+    Formats one line of the results table as rich markup.
+
+    Args:
+        cells (Tuple[str, ...]): Cell texts; these must not contain markup.
+        styles (Tuple[str, ...]): rich style per cell ('' for none).
+        widths (Tuple[int, ...]): Column widths; the last cell is left unpadded.
+        separator (str): Markup placed between cells.
+
+    Returns:
+        str: The line, ready for Console.print.
+    """
+    padded = [f"{cell:<{width}}" for cell, width in zip(cells[:-1], widths)] + [cells[-1]]
+    return separator.join(f"[{style}]{cell}[/]" if style else cell for cell, style in zip(padded, styles))
+
+
+def _plain_row(details: PackageDetails) -> str:
+    """Formats one tab-separated --plain output line, including its newline."""
+    return (
+        f"{details.name}\t{details.arch}\t{details.version or ''}\t"
+        f"{'Explicit' if details.auto_status == '0' else 'Implicit'}\t"
+        f"{details.priority or ''}\t{details.section or ''}\n"
+    )
 
 
 # --- Main Execution ---
@@ -201,6 +912,31 @@ Modes of Operation:
         default=DEFAULT_APT_EXTENDED_STATES_PATH,
         help=f"Path to the apt extended_states file (default: {DEFAULT_APT_EXTENDED_STATES_PATH})."
     )
+    parser.add_argument(
+        '--strict',
+        action='store_true',
+        help="Parse the state files with the python3-debian (Deb822) reference parser instead of the built-in scanner."
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help=f"Always parse the state files; neither read nor write the result cache in {DEFAULT_CACHE_DIR}."
+    )
+    parser.add_argument(
+        '--rebuild-index',
+        action='store_true',
+        help=f"Precompute the results of every mode into {DEFAULT_INDEX_DIR} (run as root, e.g. from a dpkg hook) and exit."
+    )
+    parser.add_argument(
+        '--unsorted',
+        action='store_true',
+        help="List packages in dpkg status file order instead of sorting them by name."
+    )
+    parser.add_argument(
+        '--plain',
+        action='store_true',
+        help="Print one tab-separated line per package (name, arch, version, auto status, priority, section) instead of a table."
+    )
     mode_group = parser.add_mutually_exclusive_group()
     mode_group.add_argument(
         '--explicitly-manual',
@@ -216,6 +952,9 @@ Modes of Operation:
 
     # Logging Setup
     log_handler = logging.getLogger().handlers[0]
+    # Also set the logger's own level so hot loops can skip debug calls
+    # entirely via logger.isEnabledFor() when not verbose
+    logger.setLevel(logging.DEBUG if args.verbose else logging.WARNING)
     if args.verbose:
         log_handler.setLevel(logging.DEBUG)
         log_handler.show_time = True
@@ -225,6 +964,10 @@ Modes of Operation:
         log_handler.setLevel(logging.WARNING)
         log_handler.show_path = False
 
+    # System-wide Index (no report; exits non-zero if anything was not written)
+    if args.rebuild_index:
+        sys.exit(0 if rebuild_index(args.status_file, args.extended_states_file) else 1)
+
     # Mode Determination
     mode_description = ""
     if args.explicitly_manual:
@@ -239,121 +982,101 @@ Modes of Operation:
         operating_mode = "default"
         mode_title = "Manually Installed Packages (Not Automatic)"
         mode_description = "Showing all installed packages not marked as automatic dependencies (`Auto-Installed: 1`). Includes implicitly manual packages."
-    logger.debug(f"Operating mode selected: [bold cyan]{operating_mode}[/]")
+    logger.debug("Operating mode selected: [bold cyan]%s[/]", operating_mode)
 
 
     try:
         # Data Gathering
-        logger.debug(f"Using status file: [i]{args.status_file}[/i]")
-        logger.debug(f"Using extended states file: [i]{args.extended_states_file}[/i]")
-        installed_set, package_details_dict = parse_dpkg_status(args.status_file)
-        auto_installed_set, explicitly_manual_set = parse_extended_states(args.extended_states_file)
-
-        # Calculation Logic
-        final_package_details: Dict[str, Dict] = {}
-        if operating_mode == "explicit":
-            logger.debug("Calculating Mode 2: Explicitly Manual (Auto-Installed: 0)")
-            explicit_set = installed_set.intersection(explicitly_manual_set)
-            for pkg in explicit_set:
-                details = package_details_dict.get(pkg, {})
-                details['auto_status'] = '0'
-                final_package_details[pkg] = details
-            logger.debug(f"Resulting packages (installed and Auto-Installed: 0): {len(final_package_details)}")
-        elif operating_mode == "filter_base":
-            logger.debug("Calculating Mode 3: Filter Base Packages")
-            default_broad_set = installed_set - auto_installed_set
-            logger.debug(f"Initial broad set (not automatic): {len(default_broad_set)}")
-            for pkg in default_broad_set:
-                is_explicit = pkg in explicitly_manual_set
-                auto_status = '0' if is_explicit else None
-                current_details = package_details_dict.get(pkg, {})
-                if is_explicit:
-                    current_details['auto_status'] = auto_status
-                    final_package_details[pkg] = current_details
-                    logger.debug(f"  Keeping '{pkg}' (explicitly marked manual)")
-                    continue
-                is_essential = current_details.get('essential') == 'yes'
-                priority = current_details.get('priority')
-                is_base_priority = priority in ('required', 'important')
-                if is_essential: logger.debug(f"  Filtering out '{pkg}' (Essential: yes)"); continue
-                if is_base_priority: logger.debug(f"  Filtering out '{pkg}' (Priority: {priority})"); continue
-                current_details['auto_status'] = auto_status
-                final_package_details[pkg] = current_details
-                logger.debug(f"  Keeping '{pkg}' (passed base filters)")
-            logger.debug(f"Resulting packages after filtering base: {len(final_package_details)}")
-        else: # Default mode
-            logger.debug("Calculating Mode 1: Default (Not Automatic)")
-            default_broad_set = installed_set - auto_installed_set
-            for pkg in default_broad_set:
-                auto_status = '0' if pkg in explicitly_manual_set else None
-                details = package_details_dict.get(pkg, {})
-                details['auto_status'] = auto_status
-                final_package_details[pkg] = details
-            logger.debug(f"Resulting packages (installed and not Auto-Installed: 1): {len(final_package_details)}")
+        logger.debug("Using status file: [i]%s[/i]", args.status_file)
+        logger.debug("Using extended states file: [i]%s[/i]", args.extended_states_file)
+        # Calculation Logic (reused from the cache when neither input changed;
+        # --strict always re-parses since it exists to cross-check results,
+        # and --no-cache lets correctness-sensitive callers opt out)
+        cache_name = f"{operating_mode}.json"
+        cache_key = None if args.strict or args.no_cache else _cache_key(args.status_file, args.extended_states_file)
+        final_package_details = None
+        if cache_key:
+            # The user cache first, then the index kept fresh by the dpkg hook
+            final_package_details = _load_cache(cache_name, cache_key)
+            if final_package_details is None:
+                final_package_details = _load_cache(cache_name, cache_key, DEFAULT_INDEX_DIR)
+        streamed = False
+        if final_package_details is None:
+            with _count_warnings() as warnings_logged:
+                if args.plain and args.unsorted:
+                    # Nothing to sort, so each row is written as soon as it is
+                    # selected and only collected for the cache
+                    final_package_details = {}
+                    for pkg, details in iter_selected_packages(operating_mode, args.status_file, args.extended_states_file, args.strict):
+                        final_package_details[pkg] = details
+                        sys.stdout.write(_plain_row(details))
+                    streamed = True
+                else:
+                    final_package_details = select_packages(operating_mode, args.status_file, args.extended_states_file, args.strict)
+            # Never cache a degraded parse (unreadable file, malformed stanzas)
+            if cache_key and not warnings_logged.count:
+                _store_cache(cache_name, cache_key, final_package_details)
+            if streamed:
+                return
 
 
         # --- Output Section ---
+        ordered_rows = list(final_package_details.values())
+        if not args.unsorted:
+            ordered_rows.sort(key=itemgetter(0, 1)) # By (name, arch), like dpkg -l
+
+        # Plain Output (for scripts; skips rich rendering and writes once)
+        if args.plain:
+            sys.stdout.write("".join(map(_plain_row, ordered_rows)))
+            return
 
-        # Print Introductory Message
-        stdout_console.print(f"\n[bold]apt-world Report[/] ([cyan]{operating_mode}[/] mode)")
-        stdout_console.print(f"{mode_description}")
-        stdout_console.print(f"Using status file: '[dim]{args.status_file}[/]'")
-        stdout_console.print(f"Using states file: '[dim]{args.extended_states_file}[/]'\n")
+        # Print Introductory Message (one render and write instead of one per line)
+        stdout_console.print("\n".join((
+            f"\n[bold]apt-world Report[/] ([cyan]{operating_mode}[/] mode)",
+            f"{mode_description}",
+            f"Using status file: '[dim]{args.status_file}[/]'",
+            f"Using states file: '[dim]{args.extended_states_file}[/]'\n",
+        )))
 
 
         # Print Results Table (or 'No packages' message)
         if final_package_details:
-            logger.debug(f"Preparing table for {len(final_package_details)} packages.")
-
-            table = Table(show_header=True, header_style="bold magenta", border_style="dim", show_edge=False)
-            table.add_column("Package Name", style="cyan", no_wrap=True, min_width=20)
-            table.add_column("Arch", style="dim", width=10)
-            table.add_column("Version", style="white")
-            table.add_column("Auto Status", justify="center")
-            table.add_column("Priority", style="blue")
-            table.add_column("Section", style="purple")
-
-            sorted_packages = sorted(final_package_details.keys())
-
-            for pkg_full_name in sorted_packages:
-                details = final_package_details[pkg_full_name]
-                auto_status_val = details.get('auto_status')
-
-                if auto_status_val == '0':
-                    status_display = "[green]Explicit[/]"
-                else: # None (Implicit)
-                    status_display = "[yellow]Implicit[/]"
-
-                parts = pkg_full_name.split(':', 1)
-                pkg_name = parts[0]
-                arch = parts[1] if len(parts) > 1 else '?'
-
-                version = details.get('version', '?')
-                priority = details.get('priority', '?')
-                section = details.get('section', '?')
-
-                table.add_row(pkg_name, arch, version, status_display, priority, section)
-
-            output_panel = Panel(
-                table,
-                title=f"[bold green]{mode_title}[/]",
-                subtitle=f"Found [yellow]{len(final_package_details)}[/] packages",
-                border_style="blue",
-                padding=(0, 1)
-            )
-            stdout_console.print(output_panel)
+            logger.debug("Preparing table for %d packages.", len(final_package_details))
+
+            # Flat markup lines instead of a rich Table: column widths come
+            # from one pass over the rows, so rich only has to parse markup
+            # rather than measure and lay out every cell.
+            rows = [
+                (d.name, d.arch, d.version or '', 'Explicit' if d.auto_status == '0' else 'Implicit', d.priority or '', d.section or '')
+                for d in ordered_rows
+            ]
+            columns = ("Package Name", "Arch", "Version", "Auto Status", "Priority", "Section")
+            # The last column is not padded, so its rule only spans the title
+            widths = tuple(max(map(len, column)) for column in zip(columns, *rows))[:-1] + (len(columns[-1]),)
+            lines = [
+                f"[bold green]{mode_title}[/]",
+                _markup_row(columns, ("bold magenta",) * len(columns), widths, " [dim]┃[/] "),
+                "[dim]" + "━╇━".join("━" * width for width in widths) + "[/]",
+            ]
+            for row in rows:
+                auto_style = "green" if row[3] == 'Explicit' else "yellow"
+                lines.append(_markup_row(row, ("cyan", "dim", "", auto_style, "blue", "purple"), widths, " [dim]│[/] "))
+            lines.append(f"Found [yellow]{len(final_package_details)}[/] packages")
+            # soft_wrap keeps rows on one line each instead of reflowing columns
+            stdout_console.print("\n".join(lines), highlight=False, emoji=False, soft_wrap=True)
 
         else:
-            logger.debug(f"No packages found matching the criteria for mode '[bold cyan]{operating_mode}[/]'.")
+            logger.debug("No packages found matching the criteria for mode '[bold cyan]%s[/]'.", operating_mode)
+            from rich.panel import Panel # Only needed for this message
             stdout_console.print(Panel(f"No packages found for mode: [bold cyan]{operating_mode}[/]", title="Result", border_style="yellow"))
 
     # Error Handling
     except FileNotFoundError as e:
-         logger.error(f"File not found: {e}", exc_info=args.verbose)
+         logger.error("File not found: %s", e, exc_info=args.verbose)
          stderr_console.print(f"[bold red]Error:[/bold red] Required file not found: {e.filename}")
          sys.exit(1)
     except Exception as e:
-        logger.error(f"An unexpected error occurred: {e}", exc_info=True)
+        logger.error("An unexpected error occurred: %s", e, exc_info=True)
         stderr_console.print(f"[bold red]Error:[/bold red] An unexpected error occurred.")
         stderr_console.print_exception(show_locals=args.verbose)
         sys.exit(1)
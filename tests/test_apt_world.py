@@ -8,6 +8,7 @@ and tests the command-line interface.
 
 import sys
 import os
+import json
 import pytest # Use pytest
 import logging
 import subprocess # For testing CLI
@@ -31,6 +32,7 @@ MOCK_STATUS_ALL_AUTO = os.path.join(MOCK_DATA_DIR, "mock_status_all_auto")
 MOCK_ESTATES_ALL_AUTO = os.path.join(MOCK_DATA_DIR, "mock_extended_states_all_auto")
 MOCK_STATUS_MALFORMED = os.path.join(MOCK_DATA_DIR, "mock_status_malformed")
 MOCK_ESTATES_MALFORMED = os.path.join(MOCK_DATA_DIR, "mock_extended_states_malformed")
+MOCK_STATUS_WHITESPACE_SEPARATOR = os.path.join(MOCK_DATA_DIR, "mock_status_whitespace_separator")
 MOCK_FILE_NON_EXISTENT = os.path.join(MOCK_DATA_DIR, "non_existent_file")
 
 # --- Helper Function ---
@@ -42,153 +44,257 @@ def run_cli(args: list[str]) -> subprocess.CompletedProcess:
     # Set encoding for consistent text handling
     return subprocess.run(command, capture_output=True, text=True, check=False)
 
+def table_packages(stdout: str) -> list[str]:
+    """Helper to extract 'package:arch' names from the rows of the rich results table."""
+    names = []
+    for line in stdout.splitlines():
+        # Body rows separate cells with '│'; the header row uses '┃'
+        cells = [cell.strip() for cell in line.strip('│ ').split('│')]
+        if len(cells) >= 2 and cells[0] and cells[1]:
+            names.append(f"{cells[0]}:{cells[1]}")
+    return names
+
+@pytest.fixture(autouse=True)
+def isolated_environment(tmp_path, monkeypatch):
+    """Keep CLI runs away from the real user cache and give rich a wide console."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg-cache"))
+    monkeypatch.setenv("COLUMNS", "200")
+
 # --- Test Functions ---
 
-# 1. Tests for get_installed_packages()
-# =====================================
+# 1. Tests for parse_dpkg_status()
+# ================================
 
-def test_get_installed_basic():
+def test_parse_dpkg_status_basic():
     """Test parsing installed packages from basic mock status file."""
-    packages = apt_world.get_installed_packages(MOCK_STATUS_BASIC)
-    expected = {'libc6:amd64', 'python3-requests:all', 'vim-tiny:amd64', 'essential-tool:amd64'}
-    assert packages == expected
-
-def test_get_installed_empty():
-    """Test parsing installed packages from an empty status file."""
-    packages = apt_world.get_installed_packages(MOCK_STATUS_EMPTY)
-    assert packages == set()
-
-def test_get_installed_none_installed():
+    details = apt_world.parse_dpkg_status(MOCK_STATUS_BASIC)
+    assert list(details) == ['libc6:amd64', 'python3-requests:all', 'vim-tiny:amd64', 'essential-tool:amd64']
+    assert details['vim-tiny:amd64'].priority == 'important'
+    assert details['python3-requests:all'][:2] == ('python3-requests', 'all')
+    assert details['libc6:amd64'].version is None
+
+def test_parse_dpkg_status_empty():
+    """Test that an empty status file (which cannot be mmapped) yields nothing."""
+    details = apt_world.parse_dpkg_status(MOCK_STATUS_EMPTY)
+    assert details == {}
+
+def test_parse_dpkg_status_none_installed():
     """Test parsing status file with no packages marked 'installed'."""
-    packages = apt_world.get_installed_packages(MOCK_STATUS_NO_INSTALLED)
-    assert packages == set()
+    assert apt_world.parse_dpkg_status(MOCK_STATUS_NO_INSTALLED) == {}
 
-def test_get_installed_all_auto_status():
+def test_parse_dpkg_status_all_auto():
     """Test parsing installed packages from the 'all_auto' status file."""
-    packages = apt_world.get_installed_packages(MOCK_STATUS_ALL_AUTO)
-    expected = {'core-lib:amd64', 'another-lib:all', 'helper-util:amd64'}
-    assert packages == expected
+    details = apt_world.parse_dpkg_status(MOCK_STATUS_ALL_AUTO)
+    assert sorted(details) == ['another-lib:all', 'core-lib:amd64', 'helper-util:amd64']
 
-def test_get_installed_malformed(caplog):
+def test_parse_dpkg_status_malformed(caplog):
     """Test parsing malformed status file, checking warnings and results."""
     caplog.set_level(logging.WARNING)
-    packages = apt_world.get_installed_packages(MOCK_STATUS_MALFORMED)
+    details = apt_world.parse_dpkg_status(MOCK_STATUS_MALFORMED)
     # Only the good package should be found
-    assert packages == {'good-package:all'}
+    assert list(details) == ['good-package:all']
     # Check that warnings were logged for the bad stanzas using records
-    assert any("without 'Package' field" in record.message for record in caplog.records if record.levelno == logging.WARNING) # Corrected substring
+    assert any("without 'Package' field" in record.message for record in caplog.records if record.levelno == logging.WARNING)
     assert any("missing 'Status' field" in record.message and "missing-status" in record.message for record in caplog.records if record.levelno == logging.WARNING)
 
-def test_get_installed_file_not_found():
+def test_parse_dpkg_status_file_not_found():
     """Test that SystemExit is raised if the status file is not found."""
     with pytest.raises(SystemExit) as e:
-        apt_world.get_installed_packages(MOCK_FILE_NON_EXISTENT)
+        apt_world.parse_dpkg_status(MOCK_FILE_NON_EXISTENT)
     assert e.value.code == 1 # Check exit code
 
-
-# 2. Tests for get_auto_installed_map()
+def test_parse_dpkg_status_status_fast_path(tmp_path):
+    """Test the exact-match Status fast path and the token-based fallback."""
+    status = tmp_path / "status"
+    status.write_text(
+        "Package: exact\nArchitecture: all\nStatus: install ok installed\n\n"
+        "Package: spaced\nArchitecture: all\nStatus: install  ok  installed\n\n"
+        "Package: half\nArchitecture: all\nStatus: install ok half-configured\n\n"
+        "Package: last-line\nArchitecture: all\nStatus: install ok installed"
+    )
+    details = apt_world.parse_dpkg_status(str(status))
+    assert list(details) == ['exact:all', 'spaced:all', 'last-line:all']
+
+def test_parse_dpkg_status_whitespace_separator():
+    """Test that a separator line holding only whitespace still splits stanzas."""
+    details = apt_world.parse_dpkg_status(MOCK_STATUS_WHITESPACE_SEPARATOR)
+    assert list(details) == ['pkg-a:all', 'pkg-b:amd64']
+    assert details['pkg-a:all'].version == '1.0'
+
+@pytest.mark.parametrize("status_file", [
+    MOCK_STATUS_BASIC, MOCK_STATUS_MALFORMED, MOCK_STATUS_NO_INSTALLED, MOCK_STATUS_WHITESPACE_SEPARATOR,
+])
+def test_parse_dpkg_status_strict_matches_scanner(status_file):
+    """Test that --strict (Deb822) and the built-in scanner agree."""
+    assert apt_world.parse_dpkg_status(status_file, strict=True) == apt_world.parse_dpkg_status(status_file)
+
+def test_parse_dpkg_status_strict_case_insensitive_fields(tmp_path):
+    """Test that --strict matches field names case-insensitively, as deb822 requires."""
+    status = tmp_path / "status"
+    status.write_text("package: a\nstatus: install ok installed\narchitecture: all\nversion: 1.0\npriority: optional\n")
+    details = apt_world.parse_dpkg_status(str(status), strict=True)
+    assert details == {'a:all': apt_world.PackageDetails('a', 'all', '1.0', 'optional', None, None)}
+
+def test_parsers_share_interned_names():
+    """Test that both parsers hand out the same interned 'package:arch' objects."""
+    details = apt_world.parse_dpkg_status(MOCK_STATUS_BASIC)
+    auto, _ = apt_world.parse_extended_states(MOCK_ESTATES_BASIC)
+    status_name = next(pkg for pkg in details if pkg == 'libc6:amd64')
+    assert status_name is next(iter(auto))
+    assert details['libc6:amd64'].priority is details['essential-tool:amd64'].priority
+
+def test_iter_installed_packages_streams_pairs():
+    """Test that the streaming scanner yields ('package:arch', details) pairs lazily."""
+    stream = apt_world.iter_installed_packages(MOCK_STATUS_ALL_AUTO)
+    assert not isinstance(stream, (list, set, dict))
+    assert sorted(pkg for pkg, _ in stream) == ['another-lib:all', 'core-lib:amd64', 'helper-util:amd64']
+
+
+# 2. Tests for parse_extended_states()
 # ====================================
 
-def test_get_auto_map_basic():
+def test_parse_extended_states_basic():
     """Test parsing auto-install info from basic mock extended_states."""
-    auto_map = apt_world.get_auto_installed_map(MOCK_ESTATES_BASIC)
-    expected = {'libc6:amd64': 1, 'python3-requests:all': 0}
-    assert auto_map == expected
+    auto, explicit = apt_world.parse_extended_states(MOCK_ESTATES_BASIC)
+    assert auto == {'libc6:amd64'}
+    assert explicit == {'python3-requests:all'}
 
-def test_get_auto_map_empty():
+def test_parse_extended_states_empty():
     """Test parsing auto-install info from empty extended_states."""
-    auto_map = apt_world.get_auto_installed_map(MOCK_ESTATES_EMPTY)
-    assert auto_map == {}
+    assert apt_world.parse_extended_states(MOCK_ESTATES_EMPTY) == (set(), set())
 
-def test_get_auto_map_file_not_found(caplog):
+def test_parse_extended_states_file_not_found(caplog):
     """Test parsing when extended_states file is missing."""
     caplog.set_level(logging.WARNING)
-    auto_map = apt_world.get_auto_installed_map(MOCK_FILE_NON_EXISTENT)
-    assert auto_map == {}
+    assert apt_world.parse_extended_states(MOCK_FILE_NON_EXISTENT) == (set(), set())
     # Check warning using records for robustness
-    assert any(f"Could not find {MOCK_FILE_NON_EXISTENT}" in record.message for record in caplog.records if record.levelno == logging.WARNING)
+    assert any("extended_states file not found" in record.message and MOCK_FILE_NON_EXISTENT in record.message for record in caplog.records if record.levelno == logging.WARNING)
 
-def test_get_auto_map_all_auto():
+def test_parse_extended_states_all_auto():
     """Test parsing auto-install info from 'all_auto' extended_states."""
-    auto_map = apt_world.get_auto_installed_map(MOCK_ESTATES_ALL_AUTO)
-    expected = {'core-lib:amd64': 1, 'another-lib:all': 1, 'helper-util:amd64': 1}
-    assert auto_map == expected
+    auto, explicit = apt_world.parse_extended_states(MOCK_ESTATES_ALL_AUTO)
+    assert auto == {'core-lib:amd64', 'another-lib:all', 'helper-util:amd64'}
+    assert explicit == set()
 
-def test_get_auto_map_malformed(caplog):
+def test_parse_extended_states_malformed(caplog):
     """Test parsing malformed extended_states, checking warnings and results."""
     caplog.set_level(logging.WARNING)
-    auto_map = apt_world.get_auto_installed_map(MOCK_ESTATES_MALFORMED)
+    auto, explicit = apt_world.parse_extended_states(MOCK_ESTATES_MALFORMED)
     # Only the good entry should be parsed
-    assert auto_map == {'good-auto:amd64': 1}
+    assert auto == {'good-auto:amd64'}
+    assert explicit == set()
     # Check warnings using records for robustness
-    assert any("without 'Package' field" in record.message for record in caplog.records if record.levelno == logging.WARNING) # Corrected substring
-    assert any("non-integer Auto-Installed value 'maybe'" in record.message and "bad-value:all" in record.message for record in caplog.records if record.levelno == logging.WARNING)
+    assert any("without 'Package' field" in record.message for record in caplog.records if record.levelno == logging.WARNING)
+    assert any("Auto-Installed value 'maybe'" in record.message and "bad-value:all" in record.message for record in caplog.records if record.levelno == logging.WARNING)
 
+def test_parse_extended_states_unqualified_names(tmp_path, caplog):
+    """Test the byte-level scan with apt's usual unqualified Package names."""
+    caplog.set_level(logging.WARNING)
+    estates = tmp_path / "extended_states"
+    estates.write_text(
+        "Package: libc6\nArchitecture: amd64\nAuto-Installed: 1\n\n"
+        "Package: vim\nArchitecture: amd64\nAuto-Installed: 0\n\n"
+        "Package: odd\nArchitecture: all\nAuto-Installed: 2\n"
+    )
+    auto, explicit = apt_world.parse_extended_states(str(estates))
+    assert auto == {'libc6:amd64'}
+    assert explicit == {'vim:amd64'}
+    assert any("Auto-Installed value '2'" in record.message and "odd:all" in record.message for record in caplog.records if record.levelno == logging.WARNING)
+
+def test_parse_extended_states_non_canonical_layout(tmp_path):
+    """Test that reordered fields fall back from the regex sweep to the line parser."""
+    estates = tmp_path / "extended_states"
+    estates.write_text(
+        "Package: libc6\nArchitecture: amd64\nAuto-Installed: 1\n\n"
+        "Architecture: amd64\nPackage: vim\nAuto-Installed: 0\n"
+    )
+    assert apt_world._scan_extended_states(estates.read_bytes()) is None
+    auto, explicit = apt_world.parse_extended_states(str(estates))
+    assert auto == {'libc6:amd64'}
+    assert explicit == {'vim:amd64'}
+
+
+@pytest.mark.parametrize("estates_file", [MOCK_ESTATES_BASIC, MOCK_ESTATES_ALL_AUTO, MOCK_ESTATES_MALFORMED])
+def test_parse_extended_states_strict_matches_scanner(estates_file):
+    """Test that --strict (Deb822) and the built-in scanner agree."""
+    assert apt_world.parse_extended_states(estates_file, strict=True) == apt_world.parse_extended_states(estates_file)
 
-# 3. Tests for get_manually_installed_packages()
-# =============================================
+def test_parse_extended_states_strict_case_insensitive_fields(tmp_path):
+    """Test that --strict matches field names case-insensitively, as deb822 requires."""
+    estates = tmp_path / "extended_states"
+    estates.write_text("package: a\narchitecture: all\nauto-installed: 1\n")
+    assert apt_world.parse_extended_states(str(estates), strict=True) == ({'a:all'}, set())
 
-def test_get_manual_basic_scenario():
+# 3. Tests for select_packages()
+# ==============================
+
+def test_select_basic_scenario():
     """Test identifying manual packages with basic mock files."""
-    manual_pkgs = apt_world.get_manually_installed_packages(
-        MOCK_STATUS_BASIC, MOCK_ESTATES_BASIC
-    )
+    selected = apt_world.select_packages("default", MOCK_STATUS_BASIC, MOCK_ESTATES_BASIC)
     # Expected: python3-requests (Auto=0), vim-tiny (not in estates), essential-tool (not in estates)
     expected = ['essential-tool:amd64', 'python3-requests:all', 'vim-tiny:amd64']
-    assert sorted(manual_pkgs) == sorted(expected)
+    assert sorted(selected) == expected
+    assert selected['python3-requests:all'].auto_status == '0'
+    assert selected['vim-tiny:amd64'].auto_status is None
 
-def test_get_manual_empty_status():
+def test_select_empty_status():
     """Test identifying manual packages with empty status file."""
-    manual_pkgs = apt_world.get_manually_installed_packages(
-        MOCK_STATUS_EMPTY, MOCK_ESTATES_BASIC
-    )
-    assert manual_pkgs == []
+    assert apt_world.select_packages("default", MOCK_STATUS_EMPTY, MOCK_ESTATES_BASIC) == {}
 
-def test_get_manual_empty_estates():
+def test_select_empty_estates():
     """Test identifying manual packages with empty extended_states file."""
-    manual_pkgs = apt_world.get_manually_installed_packages(
-        MOCK_STATUS_BASIC, MOCK_ESTATES_EMPTY
-    )
+    selected = apt_world.select_packages("default", MOCK_STATUS_BASIC, MOCK_ESTATES_EMPTY)
     # All installed packages should be considered manual
     expected = ['essential-tool:amd64', 'libc6:amd64', 'python3-requests:all', 'vim-tiny:amd64']
-    assert sorted(manual_pkgs) == sorted(expected)
+    assert sorted(selected) == expected
 
-def test_get_manual_missing_estates():
+def test_select_missing_estates():
     """Test identifying manual packages with missing extended_states file."""
-    manual_pkgs = apt_world.get_manually_installed_packages(
-        MOCK_STATUS_BASIC, MOCK_FILE_NON_EXISTENT
-    )
+    selected = apt_world.select_packages("default", MOCK_STATUS_BASIC, MOCK_FILE_NON_EXISTENT)
     # All installed packages should be considered manual
     expected = ['essential-tool:amd64', 'libc6:amd64', 'python3-requests:all', 'vim-tiny:amd64']
-    assert sorted(manual_pkgs) == sorted(expected)
+    assert sorted(selected) == expected
 
-def test_get_manual_no_installed():
+def test_select_no_installed():
     """Test identifying manual packages with no packages marked 'installed'."""
-    manual_pkgs = apt_world.get_manually_installed_packages(
-        MOCK_STATUS_NO_INSTALLED, MOCK_ESTATES_EMPTY
-    )
-    assert manual_pkgs == []
+    assert apt_world.select_packages("default", MOCK_STATUS_NO_INSTALLED, MOCK_ESTATES_EMPTY) == {}
 
-def test_get_manual_all_auto():
+def test_select_all_auto():
     """Test identifying manual packages when all installed are marked auto."""
-    manual_pkgs = apt_world.get_manually_installed_packages(
-        MOCK_STATUS_ALL_AUTO, MOCK_ESTATES_ALL_AUTO
-    )
-    assert manual_pkgs == [] # Should be empty
+    assert apt_world.select_packages("default", MOCK_STATUS_ALL_AUTO, MOCK_ESTATES_ALL_AUTO) == {}
 
-def test_get_manual_malformed_files(caplog):
+def test_select_malformed_files(caplog):
     """Test identifying manual packages with malformed input files."""
     caplog.set_level(logging.WARNING)
-    manual_pkgs = apt_world.get_manually_installed_packages(
-        MOCK_STATUS_MALFORMED, MOCK_ESTATES_MALFORMED
-    )
-    # Only 'good-package:all' is installed and it's not in the valid auto_map entries
-    assert sorted(manual_pkgs) == sorted(['good-package:all'])
+    selected = apt_world.select_packages("default", MOCK_STATUS_MALFORMED, MOCK_ESTATES_MALFORMED)
+    # Only 'good-package:all' is installed and it's not in the valid auto entries
+    assert sorted(selected) == ['good-package:all']
     # Check that warnings occurred during parsing of underlying files using records
-    # Corrected substring check:
     assert any("without 'Package' field" in record.message for record in caplog.records if record.levelno == logging.WARNING)
     assert any("missing 'Status' field" in record.message for record in caplog.records if record.levelno == logging.WARNING)
-    assert any("non-integer Auto-Installed value" in record.message for record in caplog.records if record.levelno == logging.WARNING)
+    assert any("Auto-Installed value" in record.message for record in caplog.records if record.levelno == logging.WARNING)
+
+def test_select_explicit_mode():
+    """Test that explicit mode keeps only packages marked Auto-Installed: 0."""
+    selected = apt_world.select_packages("explicit", MOCK_STATUS_BASIC, MOCK_ESTATES_BASIC)
+    assert list(selected) == ['python3-requests:all']
+
+def test_select_filter_base_mode():
+    """Test that filter_base drops required/important packages unless explicit."""
+    selected = apt_world.select_packages("filter_base", MOCK_STATUS_BASIC, MOCK_ESTATES_BASIC)
+    # vim-tiny (important) and essential-tool (required) are base packages
+    assert list(selected) == ['python3-requests:all']
+
+def test_iter_selected_packages_default_mode(tmp_path):
+    """Test that the selection generator yields non-automatic packages in status order."""
+    estates = tmp_path / "extended_states"
+    estates.write_text(
+        "Package: libc6\nArchitecture: amd64\nAuto-Installed: 1\n\n"
+        "Package: python3-requests\nArchitecture: all\nAuto-Installed: 0\n"
+    )
+    selected = list(apt_world.iter_selected_packages("default", MOCK_STATUS_BASIC, str(estates)))
+    assert [pkg for pkg, _ in selected] == ['python3-requests:all', 'vim-tiny:amd64', 'essential-tool:amd64']
+    assert [details.auto_status for _, details in selected] == ['0', None, None]
 
 
 # 4. Tests for main() / CLI (Exceptional Practice)
@@ -198,17 +304,53 @@ def test_cli_basic_run():
     """Test basic CLI execution with mock files."""
     args = ["--status-file", MOCK_STATUS_BASIC, "--extended-states-file", MOCK_ESTATES_BASIC]
     result = run_cli(args)
-    expected_output_lines = ['essential-tool:amd64', 'python3-requests:all', 'vim-tiny:amd64']
+    expected_packages = ['essential-tool:amd64', 'python3-requests:all', 'vim-tiny:amd64']
 
     assert result.returncode == 0
-    # Split stdout lines, strip whitespace, filter empty lines, sort
-    actual_output_lines = sorted(filter(None, [line.strip() for line in result.stdout.splitlines()]))
-    assert actual_output_lines == sorted(expected_output_lines)
+    # Rows of the results table, in the order they were printed (sorted by name)
+    assert table_packages(result.stdout) == expected_packages
     # Check stderr is clean (no warnings/errors expected for this case)
-    # Use lower() for case-insensitive check if needed, but exact match is better if possible
     assert "ERROR" not in result.stderr.upper()
     assert "WARNING" not in result.stderr.upper()
 
+def test_cli_unsorted_run():
+    """Test that --unsorted keeps dpkg status file order."""
+    args = ["--unsorted", "--status-file", MOCK_STATUS_BASIC, "--extended-states-file", MOCK_ESTATES_BASIC]
+    result = run_cli(args)
+    assert result.returncode == 0
+    assert table_packages(result.stdout) == ['python3-requests:all', 'vim-tiny:amd64', 'essential-tool:amd64']
+
+def test_cli_plain_output():
+    """Test that --plain prints bare tab-separated rows and no table."""
+    args = ["--plain", "--status-file", MOCK_STATUS_BASIC, "--extended-states-file", MOCK_ESTATES_BASIC]
+    result = run_cli(args)
+    assert result.returncode == 0
+    assert result.stdout.splitlines() == [
+        "essential-tool\tamd64\t\tImplicit\trequired\t",
+        "python3-requests\tall\t\tExplicit\toptional\t",
+        "vim-tiny\tamd64\t\tImplicit\timportant\t",
+    ]
+
+def test_cli_plain_unsorted_streams_and_caches(tmp_path):
+    """Test that --plain --unsorted streams rows in status file order and still fills the cache."""
+    args = ["--plain", "--unsorted", "--status-file", MOCK_STATUS_BASIC, "--extended-states-file", MOCK_ESTATES_BASIC]
+    streamed = run_cli(args)
+    assert streamed.returncode == 0
+    assert [line.split("\t")[0] for line in streamed.stdout.splitlines()] == ['python3-requests', 'vim-tiny', 'essential-tool']
+    assert (tmp_path / "xdg-cache" / "apt-world" / "default.json").exists()
+    assert run_cli(args).stdout == streamed.stdout
+
+def test_cli_sorts_by_name_then_arch(tmp_path):
+    """Test that rows are sorted by package name first and architecture second."""
+    status = tmp_path / "status"
+    status.write_text("".join(
+        f"Package: {name}\nArchitecture: {arch}\nStatus: install ok installed\n\n"
+        for name, arch in [("foo-bar", "amd64"), ("foo", "i386"), ("foo", "amd64")]
+    ))
+    args = ["--status-file", str(status), "--extended-states-file", MOCK_FILE_NON_EXISTENT]
+    result = run_cli(args)
+    assert result.returncode == 0
+    assert table_packages(result.stdout) == ['foo:amd64', 'foo:i386', 'foo-bar:amd64']
 
 def test_cli_verbose_logging():
     """Test that -v enables DEBUG logging to stderr."""
@@ -216,29 +358,30 @@ def test_cli_verbose_logging():
     result = run_cli(args)
     assert result.returncode == 0
     # Check stderr for DEBUG messages (specific messages depend on implementation)
-    assert "DEBUG: Verbose logging enabled." in result.stderr
-    assert "DEBUG: Attempting to read dpkg status from:" in result.stderr
-    assert "DEBUG: Attempting to read apt extended states from:" in result.stderr
-    assert "DEBUG: Identified" in result.stderr # Part of the manual packages message
+    assert "DEBUG" in result.stderr
+    assert "Verbose logging enabled." in result.stderr
+    assert "Parsing dpkg status file:" in result.stderr
+    assert "Parsing extended states file:" in result.stderr
+    assert "Resulting packages" in result.stderr
 
 def test_cli_status_file_not_found():
     """Test CLI exit code when status file is missing."""
     args = ["--status-file", MOCK_FILE_NON_EXISTENT]
     result = run_cli(args)
     assert result.returncode == 1 # Should exit non-zero
-    assert "ERROR: Fatal: Dpkg status file not found" in result.stderr
+    assert "ERROR" in result.stderr
+    assert "DPKG status file not found" in result.stderr
 
 def test_cli_estates_file_not_found():
     """Test CLI warning when extended_states file is missing."""
     args = ["--status-file", MOCK_STATUS_BASIC, "--extended-states-file", MOCK_FILE_NON_EXISTENT]
     result = run_cli(args)
     assert result.returncode == 0 # Should still exit zero
-    assert f"WARNING: Could not find {MOCK_FILE_NON_EXISTENT}" in result.stderr
+    assert "WARNING" in result.stderr
+    assert "extended_states file not found" in result.stderr
     # Check stdout is correct (all installed packages are manual)
-    expected_output_lines = ['essential-tool:amd64', 'libc6:amd64', 'python3-requests:all', 'vim-tiny:amd64']
-    actual_output_lines = sorted(filter(None, [line.strip() for line in result.stdout.splitlines()]))
-    assert actual_output_lines == sorted(expected_output_lines)
-
+    expected_packages = ['essential-tool:amd64', 'libc6:amd64', 'python3-requests:all', 'vim-tiny:amd64']
+    assert table_packages(result.stdout) == expected_packages
 
 def test_cli_invalid_argument():
     """Test CLI exit code with an invalid argument."""
@@ -246,4 +389,87 @@ def test_cli_invalid_argument():
     result = run_cli(args)
     assert result.returncode != 0 # Should be non-zero (usually 2 for argparse errors)
     assert f"usage: {os.path.basename(apt_world.__file__)}" in result.stderr # Use actual script name dynamically
-    assert "unrecognized arguments: --nonexistent-argument" in result.stderr
\ No newline at end of file
+    assert "unrecognized arguments: --nonexistent-argument" in result.stderr
+
+
+# 5. Tests for the result cache
+# =============================
+
+def test_cache_roundtrip_and_invalidation(tmp_path, monkeypatch):
+    """Test that cached results are reused until an input file changes."""
+    monkeypatch.setattr(apt_world, "DEFAULT_CACHE_DIR", str(tmp_path / "cache"))
+    status = tmp_path / "status"
+    status.write_text("Package: a\nArchitecture: all\nStatus: install ok installed\n")
+    key = apt_world._cache_key(str(status), MOCK_ESTATES_EMPTY)
+    selected = {'a:all': apt_world.PackageDetails('a', 'all', '1.0', 'optional', None, None, '0')}
+    apt_world._store_cache("default.json", key, selected)
+    assert apt_world._load_cache("default.json", key) == selected
+
+    status.write_text("Package: b\nArchitecture: all\nStatus: install ok installed\n")
+    new_key = apt_world._cache_key(str(status), MOCK_ESTATES_EMPTY)
+    assert new_key != key
+    assert apt_world._load_cache("default.json", new_key) is None
+
+def test_cli_no_cache(tmp_path):
+    """Test that --no-cache neither writes nor reads the result cache."""
+    cache_dir = tmp_path / "xdg-cache" / "apt-world"
+    args = ["--status-file", MOCK_STATUS_BASIC, "--extended-states-file", MOCK_ESTATES_BASIC]
+    assert run_cli(["--no-cache"] + args).returncode == 0
+    assert not cache_dir.exists()
+    assert run_cli(args).returncode == 0
+    assert (cache_dir / "default.json").exists()
+    result = run_cli(["--no-cache", "-v"] + args)
+    assert "Using cached results" not in result.stderr
+
+def test_rebuild_index(tmp_path):
+    """Test that --rebuild-index stores every mode under the current cache key."""
+    index_dir = str(tmp_path / "index")
+    assert apt_world.rebuild_index(MOCK_STATUS_BASIC, MOCK_ESTATES_BASIC, index_dir)
+    key = apt_world._cache_key(MOCK_STATUS_BASIC, MOCK_ESTATES_BASIC)
+    for mode in ("default", "explicit", "filter_base"):
+        cached = apt_world._load_cache(f"{mode}.json", key, index_dir)
+        assert cached == apt_world.select_packages(mode, MOCK_STATUS_BASIC, MOCK_ESTATES_BASIC)
+    assert not apt_world.rebuild_index(MOCK_STATUS_BASIC, MOCK_FILE_NON_EXISTENT, index_dir)
+
+def test_rebuild_index_parses_once(tmp_path, monkeypatch):
+    """Test that --rebuild-index parses each state file once for all modes."""
+    calls = []
+    for name in ("parse_extended_states", "_iter_installed_stanzas"):
+        original = getattr(apt_world, name)
+        monkeypatch.setattr(apt_world, name, lambda *args, _name=name, _original=original: calls.append(_name) or _original(*args))
+    assert apt_world.rebuild_index(MOCK_STATUS_BASIC, MOCK_ESTATES_ALL_AUTO, str(tmp_path / "index"))
+    assert sorted(calls) == ["_iter_installed_stanzas", "parse_extended_states"]
+
+def test_rebuild_index_skips_degraded_parse(tmp_path):
+    """Test that nothing is indexed when parsing reported errors."""
+    index_dir = tmp_path / "index"
+    estates_dir = tmp_path / "estates-dir"
+    estates_dir.mkdir()
+    # A directory passes the stat-based cache key but cannot be read
+    assert not apt_world.rebuild_index(MOCK_STATUS_BASIC, str(estates_dir), str(index_dir))
+    assert not index_dir.exists()
+
+def test_cli_does_not_cache_degraded_parse(tmp_path):
+    """Test that results are not cached when parsing logged errors or warnings."""
+    cache_dir = tmp_path / "xdg-cache" / "apt-world"
+    # A directory passes the stat-based cache key but cannot be read
+    args = ["--status-file", MOCK_STATUS_BASIC, "--extended-states-file", str(tmp_path)]
+    assert run_cli(args).returncode == 0
+    assert not cache_dir.exists()
+    args = ["--status-file", MOCK_STATUS_MALFORMED, "--extended-states-file", MOCK_ESTATES_MALFORMED]
+    assert run_cli(args).returncode == 0
+    assert "Auto-Installed value" in run_cli(args).stderr
+    assert not cache_dir.exists()
+
+def test_cache_ignores_malformed_entry(tmp_path, monkeypatch):
+    """Test that a corrupt or foreign cache file counts as a miss."""
+    monkeypatch.setattr(apt_world, "DEFAULT_CACHE_DIR", str(tmp_path))
+    key = apt_world._cache_key(MOCK_STATUS_BASIC, MOCK_ESTATES_BASIC)
+    (tmp_path / "default.json").write_text('{"key": %s, "packages": [["a:all", "a"]]}' % json.dumps(key))
+    assert apt_world._load_cache("default.json", key) is None
+    (tmp_path / "default.json").write_bytes(b"\x80\x05not json")
+    assert apt_world._load_cache("default.json", key) is None
+
+def test_cache_key_missing_file():
+    """Test that nothing is cached when an input file is missing."""
+    assert apt_world._cache_key(MOCK_STATUS_BASIC, MOCK_FILE_NON_EXISTENT) is None